@@ -1,37 +1,73 @@
-from flask import Flask, send_from_directory, request, jsonify
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
+from flask import Flask, request, Response
 from dotenv import load_dotenv
+from pydantic import ValidationError
+from whitenoise import WhiteNoise
 
 from reasoning import GameState
 from card import Card
+from deck import Deck
+from event_log import last_event_id
+from loop_resources import aclose_loop_resources
+from orjson_provider import OrjsonProvider
 
 
 game_state = GameState()
 
+# debates run one at a time off the request thread, the frontend follows along on /api/sync
+debate_runner = ThreadPoolExecutor(max_workers=1)
+
 load_dotenv()
 
 app = Flask(
     __name__,
     static_folder="frontend/dist",
 )
-
-@app.route("/")
-def index():
-    return send_from_directory(app.static_folder, "index.html")
+app.json = OrjsonProvider(app)
+
+# the built frontend is served by whitenoise in front of flask
+app.wsgi_app = WhiteNoise(
+    app.wsgi_app,
+    root=app.static_folder,
+    index_file=True,
+    # vite puts a content hash in every file name under assets/
+    immutable_file_test=lambda path, url: url.startswith("/assets/"),
+    # when run directly for development, pick up `npm run build` without a restart
+    autorefresh=__name__ == "__main__",
+)
 
 @app.route("/api/deck", methods=["POST"])
 def get_deck():
     try:
-        agents = request.get_json()["agents"]
-        for agent in agents:
-            game_state.cards.append(Card(agent["model"],
-                              agent["expertise"],
-                              agent["personality"],
-                              agent["role"]))
-    except KeyError as e:
+        deck = Deck.model_validate_json(request.get_data())
+        # unknown models or roles raise KeyError
+        cards = [Card(agent.model, agent.expertise, agent.personality, agent.role)
+                 for agent in deck.agents]
+    except (ValidationError, KeyError):
         return "", 400
 
+    game_state.cards.extend(cards)
+
     return "", 200
 
+async def _debate():
+    try:
+        await game_state.start_debate()
+    finally:
+        # the llm clients belong to this loop, close them before asyncio.run drops it
+        await aclose_loop_resources()
+
+def run_debate():
+    try:
+        asyncio.run(_debate())
+    except Exception as e:
+        print("debate crashed " + str(e))
+    finally:
+        game_state.debating = False
+
 @app.route("/api/puzzle", methods=["POST"])
 def get_puzzle():
     if game_state.debating:
@@ -39,37 +75,68 @@ def get_puzzle():
 
     try:
         game_state.puzzle = request.get_json()["puzzle"]
-        game_state.start_debate()
     except KeyError:
         return "", 400
 
-    return "", 200
-
-# this endpoint will get polled by frontend to pull new messages in the debate
+    # set before submitting so a second request can't start another debate in the meantime
+    game_state.debating = True
+    debate_runner.submit(run_debate)
+
+    return "", 202
+
+def merge_tokens(events):
+    """
+    squashes a batch of log events before sending: a turn's token pieces become one token
+    event with its text so far, or are skipped if the turn finished (or was dropped) within
+    the batch. a page that joins mid-debate gets each turn's text in one go, not token by token
+    """
+    finished = {turn for _, (event, turn, _, _) in events if event != "token"}
+
+    merged = []
+    partial = {}
+    for _, (event, turn, card, msg) in events:
+        if event != "token":
+            merged.append((event, turn, card, msg))
+        elif turn not in finished:
+            if turn not in partial:
+                partial[turn] = []
+                merged.append(("token", turn, card, partial[turn]))
+            partial[turn].append(msg)
+
+    return [(event, turn, card, msg if isinstance(msg, str) else "".join(msg))
+            for event, turn, card, msg in merged]
+
+# the frontend keeps this open and new debate messages are pushed down it as they happen
+# (stays sync, flask can't stream from an async generator)
 @app.route("/api/sync", methods=["GET"])
 def sync():
-    # if msg is empty frontend will ignore it
-    msg = ""
-    colour = ""
-
-    try:
-        card, msg = game_state.debate_history.pop(0)
-        colour = {"facilitator": "#DC143C",
-                  "critic": "#00ff00",
-                  "reasoner": "#0000ff",
-                  "stateTracker": "#ffff00"}[card.role]
-    except IndexError:
-        pass
-
-    return jsonify({
-        "text": msg,
-        "colour": colour,
-    })
-
-@app.route("/<path:path>")
-def static_files(path):
-    return send_from_directory(app.static_folder, path)
-
+    # each stream follows the log from its own cursor, a reconnecting EventSource
+    # sends the id of the last event it got
+    cursor = last_event_id(request.headers)
+
+    def stream():
+        nonlocal cursor
+        while True:
+            events = game_state.debate_history.since(cursor, timeout=15)
+            if not events:
+                # comment line so the connection isn't dropped while the models think
+                yield ": keepalive\n\n"
+                continue
+
+            merged = merge_tokens(events)
+            cursor = events[-1][0]
+            for i, (event, turn, card, msg) in enumerate(merged):
+                data = orjson.dumps({'id': turn, 'text': msg, 'colour': card.colour}).decode()
+
+                # only the batch's last frame carries an id, merged frames can't be resumed from halfway
+                frame = f"id: {cursor}\n" if i == len(merged) - 1 else ""
+                # tokens and dropped turns get their own event types, finished messages use the default one
+                if event != "message":
+                    frame += f"event: {event}\n"
+                yield frame + f"data: {data}\n\n"
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache"})
 
 if __name__ == "__main__":
     app.run(debug=True, port=5000)
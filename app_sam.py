@@ -3,15 +3,23 @@ Flask API for SAM-based Debate System
 Bridges the React frontend with Solace Agent Mesh for multi-model debates.
 """
 
-from flask import Flask, send_from_directory, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 from dotenv import load_dotenv
+from pydantic import ValidationError
+from whitenoise import WhiteNoise
 import os
 import json
+import orjson
 import requests
 from threading import Thread
-from queue import Queue
+import platform
 import time
+from gevent import get_hub, monkey
+
+from deck import Deck
+from event_log import EventLog, last_event_id
+from orjson_provider import OrjsonProvider
 
 load_dotenv()
 
@@ -19,6 +27,18 @@ app = Flask(
     __name__,
     static_folder="frontend/dist",
 )
+app.json = OrjsonProvider(app)
+
+# Serve the built frontend from WhiteNoise instead of Flask routes
+app.wsgi_app = WhiteNoise(
+    app.wsgi_app,
+    root=app.static_folder,
+    index_file=True,
+    # Vite puts a content hash in every file name under assets/
+    immutable_file_test=lambda path, url: url.startswith("/assets/"),
+    # When run directly for development, pick up `npm run build` without a restart
+    autorefresh=__name__ == "__main__",
+)
 
 # Enable CORS for React frontend
 CORS(app, origins=["http://localhost:5173", "http://localhost:5000", "http://127.0.0.1:5173", "http://127.0.0.1:5000"])
@@ -31,7 +51,8 @@ class DebateState:
     def __init__(self):
         self.cards = []
         self.puzzle = None
-        self.debate_history = Queue()
+        # Followed by every /api/sync stream, see event_log.py
+        self.debate_history = EventLog()
         self.debating = False
         self.current_session_id = None
 
@@ -39,9 +60,46 @@ class DebateState:
 debate_state = DebateState()
 
 
+# Under gunicorn, wsgi.py monkey-patches the process for gevent, which turns Thread
+# into a greenlet on the server's hub. Debates (the direct one runs its own asyncio
+# loop) get a real OS thread from gevent's threadpool instead, and hand their
+# messages back to the hub's thread rather than touching its locks from outside.
+_GEVENT = monkey.is_module_patched("threading")
+_hub = None
+if _GEVENT:
+    # openai looks this up once per client and it shells out to `uname -p` the first
+    # time, which gevent's subprocess can't do cleanly from a threadpool thread
+    platform.uname().processor
+
+
+def _start_debate_thread(target, *args):
+    """Run a debate in the background on a real OS thread."""
+    global _hub
+    if _GEVENT:
+        _hub = get_hub()
+        _hub.threadpool.spawn(target, *args)
+    else:
+        Thread(target=target, args=args, daemon=True).start()
+
+
+def _on_hub(func, *args):
+    """Call func(*args) on the server's thread, from a debate thread."""
+    if _GEVENT:
+        _hub.loop.run_callback_threadsafe(func, *args)
+    else:
+        func(*args)
+
+
+def _publish(entry: dict):
+    """Add a message to the debate log from a debate thread."""
+    _on_hub(debate_state.debate_history.append, entry)
+
+
 def _run_sam_debate(puzzle: str, cards: list):
     """Run debate through SAM gateway in background thread."""
     debate_state.debating = True
+    # Pages that connect from now on only get this debate
+    _on_hub(debate_state.debate_history.clear)
     
     try:
         # Build the prompt for the DebateOrchestrator
@@ -79,13 +137,13 @@ Run the debate and show me the full discussion."""
             for part in parts:
                 if part.get("type") == "text" or part.get("kind") == "text":
                     text = part.get("text", "")
-                    debate_state.debate_history.put({
+                    _publish({
                         "role": "system",
                         "message": text,
                         "colour": "#FFFFFF"
                     })
         else:
-            debate_state.debate_history.put({
+            _publish({
                 "role": "error",
                 "message": f"SAM Gateway error: {response.status_code} - {response.text}",
                 "colour": "#FF0000"
@@ -95,7 +153,7 @@ Run the debate and show me the full discussion."""
         # SAM not running - fall back to direct debate
         _run_direct_debate(puzzle, cards)
     except Exception as e:
-        debate_state.debate_history.put({
+        _publish({
             "role": "error", 
             "message": f"Error: {str(e)}",
             "colour": "#FF0000"
@@ -118,7 +176,7 @@ def _run_direct_debate(puzzle: str, cards: list):
     def on_message(role: str, message: str, model: str):
         """Callback for each debate message - pushes to queue immediately."""
         colour = colour_map.get(role, "#FFFFFF")
-        debate_state.debate_history.put({
+        _publish({
             "role": role,
             "message": message,
             "colour": colour,
@@ -134,40 +192,29 @@ def _run_direct_debate(puzzle: str, cards: list):
         )
         
         if result["status"] != "completed":
-            debate_state.debate_history.put({
+            _publish({
                 "role": "error",
                 "message": result.get("message", "Unknown error"),
                 "colour": "#FF0000"
             })
     except Exception as e:
-        debate_state.debate_history.put({
+        _publish({
             "role": "error",
             "message": f"Direct debate error: {str(e)}",
             "colour": "#FF0000"
         })
 
 
-@app.route("/")
-def index():
-    return send_from_directory(app.static_folder, "index.html")
-
-
 @app.route("/api/deck", methods=["POST"])
 def get_deck():
     """Receive the deck of cards (agent configurations) from the frontend."""
     try:
-        agents = request.get_json()["agents"]
-        debate_state.cards = []
-        for agent in agents:
-            debate_state.cards.append({
-                "model": agent["model"],
-                "expertise": agent["expertise"],
-                "personality": agent["personality"],
-                "role": agent["role"]
-            })
-        return "", 200
-    except KeyError as e:
-        return jsonify({"error": f"Missing field: {str(e)}"}), 400
+        deck = Deck.model_validate_json(request.get_data())
+    except ValidationError as e:
+        return jsonify({"error": f"Invalid deck: {str(e)}"}), 400
+
+    debate_state.cards = [agent.model_dump() for agent in deck.agents]
+    return "", 200
 
 
 @app.route("/api/puzzle", methods=["POST"])
@@ -184,11 +231,8 @@ def get_puzzle():
             return jsonify({"error": "No cards configured. Call /api/deck first."}), 400
         
         # Start debate in background thread - SAM with fallback to direct
-        thread = Thread(
-            target=_run_sam_debate,  # Try SAM first, falls back to direct if unavailable
-            args=(puzzle, debate_state.cards)
-        )
-        thread.start()
+        # Try SAM first, falls back to direct if unavailable
+        _start_debate_thread(_run_sam_debate, puzzle, debate_state.cards)
         
         return "", 200
     except KeyError:
@@ -209,11 +253,7 @@ def get_puzzle_sam():
             return jsonify({"error": "No cards configured. Call /api/deck first."}), 400
         
         # Start SAM debate in background thread
-        thread = Thread(
-            target=_run_sam_debate,
-            args=(puzzle, debate_state.cards)
-        )
-        thread.start()
+        _start_debate_thread(_run_sam_debate, puzzle, debate_state.cards)
         
         return "", 200
     except KeyError:
@@ -232,7 +272,7 @@ def push_message():
         message = data.get("message", "")
         colour = data.get("colour", "#FFFFFF")
         
-        debate_state.debate_history.put({
+        debate_state.debate_history.append({
             "role": role,
             "message": message,
             "colour": colour
@@ -245,25 +285,30 @@ def push_message():
 
 @app.route("/api/sync", methods=["GET"])
 def sync():
-    """Poll for new messages in the debate."""
-    msg = ""
-    colour = ""
-    role = ""
-
-    try:
-        entry = debate_state.debate_history.get_nowait()
-        msg = entry.get("message", "")
-        colour = entry.get("colour", "#FFFFFF")
-        role = entry.get("role", "")
-    except:
-        pass
-
-    return jsonify({
-        "text": msg,
-        "colour": colour,
-        "role": role,
-        "debating": debate_state.debating
-    })
+    """Stream debate messages to the frontend as server-sent events."""
+    # Each stream reads from its own cursor; a reconnecting EventSource resumes from Last-Event-ID
+    cursor = last_event_id(request.headers)
+
+    def stream():
+        nonlocal cursor
+        while True:
+            events = debate_state.debate_history.since(cursor, timeout=15)
+            if not events:
+                # Comment line keeps the connection alive between messages
+                yield ": keepalive\n\n"
+                continue
+
+            for cursor, entry in events:
+                payload = orjson.dumps({
+                    "text": entry.get("message", ""),
+                    "colour": entry.get("colour", "#FFFFFF"),
+                    "role": entry.get("role", ""),
+                    "debating": debate_state.debating
+                }).decode()
+                yield f"id: {cursor}\ndata: {payload}\n\n"
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache"})
 
 
 @app.route("/api/status", methods=["GET"])
@@ -282,21 +327,11 @@ def reset():
     """Reset the debate state."""
     debate_state.cards = []
     debate_state.puzzle = None
-    # Clear the queue
-    while not debate_state.debate_history.empty():
-        try:
-            debate_state.debate_history.get_nowait()
-        except:
-            break
+    debate_state.debate_history.clear()
     debate_state.debating = False
     return "", 200
 
 
-@app.route("/<path:path>")
-def static_files(path):
-    return send_from_directory(app.static_folder, path)
-
-
 if __name__ == "__main__":
     print("=" * 60)
     print("SAM-Integrated Debate Server")
@@ -308,7 +343,7 @@ if __name__ == "__main__":
     print("  POST /api/deck   - Configure debate participants")
     print("  POST /api/puzzle - Start debate (direct, no SAM needed)")
     print("  POST /api/puzzle/sam - Start debate through SAM")
-    print("  GET  /api/sync   - Poll for debate messages")
+    print("  GET  /api/sync   - Stream debate messages (SSE)")
     print("  GET  /api/status - Get debate status")
     print("  POST /api/reset  - Reset debate state")
     print("=" * 60)
@@ -5,6 +5,8 @@ See frontend/src/pages/CardSelect.jsx for lists of models, expertises, personali
 from llms import *
 
 class Card:
+    __slots__ = ("model", "expertise", "personality", "role", "colour", "client")
+
     def __init__(self, model: str, expertise: str, personality: str, role: str):
         self.model = model
         self.expertise = expertise
@@ -23,6 +25,14 @@ class Card:
                  "stateTracker": "Your job is not to reason, but to keep your teammates in check. Pay close attention to everything that's being discussed to make sure none of your teammates are fabricating facts. If that happens, remind them of the facts to guide them back on track."
                  }
 
+        colours = {"facilitator": "#DC143C",
+                   "critic": "#00ff00",
+                   "reasoner": "#0000ff",
+                   "stateTracker": "#ffff00"}
+
+        # colour the frontend draws this card's messages in
+        self.colour = colours[self.role]
+
         self.client = clients[self.model](
             f'''
             You are part of an elite reasoning team whose objective is to solve puzzles.
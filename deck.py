@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+
+class AgentSpec(BaseModel):
+    """One card as sent by the frontend, see frontend/src/pages/CardSelect.jsx"""
+
+    model: str
+    expertise: str
+    personality: str
+    role: str
+
+
+class Deck(BaseModel):
+    """Body of POST /api/deck, parsed and validated in one pass with Deck.model_validate_json"""
+
+    agents: list[AgentSpec]
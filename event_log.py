@@ -0,0 +1,56 @@
+import threading
+
+
+class EventLog:
+    """
+    Append-only log of debate events, followed by every open /api/sync stream
+
+    Each stream keeps its own cursor (the id of the last event it sent) instead of
+    taking events off a shared queue, so a stream whose client has gone away can't
+    swallow events meant for anyone else, and a client that reconnects with
+    Last-Event-ID picks up where it left off.
+
+    methods:
+        append(event) -> int: add an event, returns its id (ids start at 1 and never repeat)
+        since(cursor, timeout) -> list[(int, event)]: events after cursor, waits up to timeout for one
+        clear() -> None: drop every event, ids keep counting up from where they were
+    """
+
+    def __init__(self):
+        self._events = []
+        # id of the event just before self._events[0]
+        self._offset = 0
+        self._changed = threading.Condition()
+
+    def _last_id(self):
+        return self._offset + len(self._events)
+
+    def append(self, event):
+        with self._changed:
+            self._events.append(event)
+            self._changed.notify_all()
+            return self._last_id()
+
+    def since(self, cursor, timeout=None):
+        with self._changed:
+            if cursor > self._last_id():
+                # the client saw ids from before a restart, send it everything
+                cursor = 0
+            self._changed.wait_for(lambda: self._last_id() > cursor, timeout)
+
+            start = max(cursor - self._offset, 0)
+            return [(self._offset + i + 1, event)
+                    for i, event in enumerate(self._events[start:], start)]
+
+    def clear(self):
+        with self._changed:
+            self._offset = self._last_id()
+            self._events.clear()
+
+
+def last_event_id(headers):
+    """Cursor to resume an /api/sync stream from, 0 for a fresh connection"""
+    try:
+        return max(int(headers.get("Last-Event-ID", 0)), 0)
+    except ValueError:
+        return 0
@@ -5,7 +5,11 @@ import Button from "../components/common/Button";
 const renderMarkdown = (text) => {
   if (!text) return text;
   // Remove <think>...</think> blocks (some models output reasoning)
-  let cleaned = text.replace(/<think>[\s\S]*?<\/think>/gi, "").trim();
+  let cleaned = text
+    .replace(/<think>[\s\S]*?<\/think>/gi, "")
+    // hide reasoning that's still streaming in
+    .replace(/<think>[\s\S]*$/i, "")
+    .trim();
   const parts = cleaned.split(/(\*\*[^*]+\*\*)/g);
   return parts.map((part, i) => {
     if (part.startsWith("**") && part.endsWith("**")) {
@@ -45,24 +49,48 @@ const Game = () => {
   const historyEndRef = useRef(null);
 
   useEffect(() => {
-    const interval = setInterval(async () => {
-      try {
-        const response = await fetch("http://localhost:5000/api/sync");
-        const data = await response.json();
-        if (data.text) {
-          setHistory((prev) => {
-            if (prev[prev.length - 1]?.text !== data.text) {
-              return [...prev, { text: data.text, colour: data.colour }];
-            }
-            return prev;
-          });
+    const events = new EventSource("http://localhost:5000/api/sync");
+
+    // a streamed turn arrives as "token" events, then a normal message with
+    // the same id replaces them with the finished text
+    const addToTurn = (data, append) => {
+      setHistory((prev) => {
+        const idx =
+          data.id === undefined ? -1 : prev.findIndex((item) => item.id === data.id);
+        if (idx === -1) {
+          return [...prev, { id: data.id, text: data.text, colour: data.colour }];
         }
-      } catch (error) {
-        console.error("Sync error:", error);
+        const next = [...prev];
+        next[idx] = {
+          ...next[idx],
+          text: append ? next[idx].text + data.text : data.text,
+        };
+        return next;
+      });
+    };
+
+    events.addEventListener("token", (event) => {
+      addToTurn(JSON.parse(event.data), true);
+    });
+
+    // the turn failed, drop whatever was streamed for it
+    events.addEventListener("drop", (event) => {
+      const { id } = JSON.parse(event.data);
+      setHistory((prev) => prev.filter((item) => item.id !== id));
+    });
+
+    events.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      if (data.text) {
+        addToTurn(data, false);
       }
-    }, 3000);
+    };
+
+    events.onerror = (error) => {
+      console.error("Sync error:", error);
+    };
 
-    return () => clearInterval(interval);
+    return () => events.close();
   }, []);
 
   useEffect(() => {
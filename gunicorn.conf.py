@@ -2,4 +2,9 @@ bind = f"0.0.0.0:{5000}"
 
 workers = 1
 
+# every open page holds an /api/sync stream and debates block on LLM calls,
+# gevent lets one worker juggle all of them
+worker_class = "gevent"
+worker_connections = 1000
+
 preload = True
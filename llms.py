@@ -1,11 +1,128 @@
+import asyncio
+import hashlib
+import json
 import os
+import random
 import re
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 
-from groq import Groq
+from groq import Groq, AsyncGroq, APIConnectionError, InternalServerError, RateLimitError
 from google import genai
+import httpx
 import requests
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+
+from loop_resources import per_loop
+
+
+# one client per provider, shared by every card, so they share a connection pool
+_groq_client = None
+_openai_client = None
+_gemini_client = None
+
+
+def _groq():
+    global _groq_client
+    if _groq_client is None:
+        _groq_client = Groq(api_key=os.environ["GROQ_API_KEY"])
+    return _groq_client
+
+
+def _openai():
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+    return _openai_client
+
+
+def _gemini():
+    global _gemini_client
+    if _gemini_client is None:
+        _gemini_client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+    return _gemini_client
+
+
+# async clients and semaphores are bound to the event loop they were made on, so all
+# cards share one per loop. app.py's run_debate closes them when its loop is done
+def _async_groq():
+    # GroqModel does its own retrying
+    return per_loop(
+        "groq", lambda: AsyncGroq(api_key=os.environ["GROQ_API_KEY"], max_retries=0)
+    )
+
+
+def _async_openai():
+    return per_loop(
+        "openai", lambda: AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
+    )
+
+
+# kept alive between calls so deepseek requests don't redo the TLS handshake every time
+def _deepseek_http():
+    return per_loop("deepseek_http", lambda: httpx.AsyncClient(timeout=60))
+
+
+# caps how many groq requests are in flight at once
+def _groq_semaphore():
+    return per_loop("groq_semaphore", lambda: asyncio.Semaphore(32))
+
+
+# chars/4 is close enough for deciding when a context has gotten too long
+def _estimate_tokens(messages):
+    return sum(len(m["content"]) for m in messages) // 4
+
+
+# the same model given the exact same context doesn't need to be asked again.
+# opt-in with DEBATE_CACHE=1 (same switch as src/debate_tools), since answers are
+# sampled and replaying them would make every rerun of a puzzle identical
+_response_cache = OrderedDict()
+_RESPONSE_CACHE_SIZE = 256
+
+
+def _cache_enabled():
+    return os.environ.get("DEBATE_CACHE") == "1"
+
+
+def _cache_key(model, context):
+    return hashlib.blake2b(
+        json.dumps([model, context]).encode(), digest_size=16
+    ).digest()
+
+
+def _cache_get(key):
+    if not _cache_enabled():
+        return None
+    response = _response_cache.get(key)
+    if response is not None:
+        _response_cache.move_to_end(key)
+    return response
+
+
+def _cache_put(key, response):
+    if not _cache_enabled():
+        return
+    _response_cache[key] = response
+    if len(_response_cache) > _RESPONSE_CACHE_SIZE:
+        _response_cache.popitem(last=False)
+
+
+# reads a streamed chat completion, passing each piece on as it arrives
+async def _collect_stream(stream, on_token=None):
+    parts = []
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            if on_token is not None:
+                on_token(delta)
+    return "".join(parts)
+
+
+def _remove_thinking(text):
+    return re.sub(r"<think>[\s\S]*?</think>", "", text)
 
 
 class Llm(ABC):
@@ -21,6 +138,8 @@ class Llm(ABC):
         init() -> None: call before use
         clear_context() -> None: wipe chat history
         get_response() -> str: send a message and receive a response, added to chat history (context)
+        aget_response(on_token=None) -> str: same as get_response, but awaitable so cards can be asked concurrently.
+            on_token(str) is called with each piece of the response as it streams in, if the model supports it
     """
 
     def __init__(self, instructions):
@@ -43,113 +162,229 @@ class Llm(ABC):
     @abstractmethod
     def get_response(self, prompt): ...
 
+    async def aget_response(self, prompt, on_token=None):
+        # models without an async client just run the blocking call in a thread
+        return await asyncio.to_thread(self.get_response, prompt)
+
 
 class Gpt41(Llm):
     def __init__(self, instructions=""):
         super().__init__(instructions)
 
-        self._instructions = instructions
-        self._messages = []
+        self._static_system = instructions
+        self._dynamic_messages = []
 
         self.init()
 
     def add_context(self, msg):
-        self._messages.append(msg)
+        self._dynamic_messages.append({"role": "user", "content": msg})
 
     def clear_context(self):
-        self._messages.clear()
+        self._dynamic_messages.clear()
 
     def _construct_context(self):
         context = (
-            [{"role": "developer", "content": self._instructions}]
-            if self._instructions
+            [{"role": "developer", "content": self._static_system}]
+            if self._static_system
             else []
         )
-        context += [{"role": "user", "content": m} for m in self._messages]
-        return context
+        return context + self._dynamic_messages
 
     def init(self):
-        self.client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+        self.client = _openai()
 
     def get_response(self, prompt):
-        self._messages.append(prompt)
+        self.add_context(prompt)
+
+        context = self._construct_context()
+        key = _cache_key("gpt-4.1", context)
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
 
         response = self.client.chat.completions.create(
             model="gpt-4.1",
-            messages=self._construct_context(),
+            messages=context,
         )
+        _cache_put(key, response.choices[0].message.content)
         return response.choices[0].message.content
 
+    async def aget_response(self, prompt, on_token=None):
+        self.add_context(prompt)
+
+        context = self._construct_context()
+        key = _cache_key("gpt-4.1", context)
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+
+        stream = await _async_openai().chat.completions.create(
+            model="gpt-4.1",
+            messages=context,
+            stream=True,
+        )
+        response = await _collect_stream(stream, on_token)
+        _cache_put(key, response)
+        return response
+
 
 class GroqModel(Llm, ABC):
+    # cheap model used to squash old turns once the context gets too long
+    summary_model = "llama-3.3-70b-versatile"
+
+    call_timeout_s = 60
+    retry_base_delay_s = 1
+    max_retries = 5
+
     def __init__(self, model, instructions):
         super().__init__(instructions)
 
-        self._messages = []
-        self._instructions = instructions
+        # never edited after this, providers only cache an identical prompt prefix
+        self._static_system = instructions
+        # everything else (turns, summaries) goes after it
+        self._dynamic_messages = []
         self.groq_model = model
 
+        self._token_budget = 8000
+
         self.init()
 
     def init(self):
-        self.client = Groq(api_key=os.environ["GROQ_API_KEY"])
+        self.client = _groq()
 
     def add_context(self, msg):
-        self._messages.append(msg)
+        self._dynamic_messages.append({"role": "user", "content": msg})
 
     def clear_context(self):
-        self._messages.clear()
+        self._dynamic_messages.clear()
 
     def _construct_context(self):
         context = (
-            [{"role": "system", "content": self._instructions}]
-            if self._instructions
+            [{"role": "system", "content": self._static_system}]
+            if self._static_system
             else []
         )
-        context += [{"role": "user", "content": m} for m in self._messages]
-        return context
+        return context + self._dynamic_messages
+
+    def _summary_request(self):
+        if len(self._dynamic_messages) < 3:
+            return None
+        if _estimate_tokens(self._construct_context()) <= self._token_budget:
+            return None
+
+        # first message is the puzzle and the last is the latest turn,
+        # those stay word for word
+        turns = "\n\n".join(m["content"] for m in self._dynamic_messages[1:-1])
+        return [{"role": "user",
+                 "content": "Summarise these debate turns in 200 tokens or less. "
+                            "Keep every fact and every proposed answer.\n\n" + turns}]
+
+    def _apply_summary(self, summary):
+        self._dynamic_messages[1:-1] = [
+            {"role": "system", "content": "Prior debate summary: " + summary}
+        ]
+
+    def _compact_context(self):
+        request = self._summary_request()
+        if request is not None:
+            completion = self.client.chat.completions.create(
+                messages=request,
+                model=self.summary_model,
+            )
+            self._apply_summary(_remove_thinking(completion.choices[0].message.content))
+
+    async def _acreate(self, on_token=None, **kwargs):
+        # rate limits and flaky connections get retried with exponential backoff
+        # instead of killing the card's turn.
+        # with stream=True the whole body is read here and the text is returned, so the
+        # semaphore covers the generation and a connection dropped mid-stream is retried
+        # (the final message event replaces any tokens already sent for the turn)
+        async with _groq_semaphore():
+            for attempt in range(self.max_retries):
+                try:
+                    completion = await _async_groq().chat.completions.create(
+                        timeout=self.call_timeout_s, **kwargs
+                    )
+                    if not kwargs.get("stream"):
+                        return completion
+                    async with completion:
+                        return await _collect_stream(completion, on_token)
+                except (RateLimitError, APIConnectionError, InternalServerError,
+                        httpx.TransportError):
+                    if attempt == self.max_retries - 1:
+                        raise
+                    await asyncio.sleep(
+                        self.retry_base_delay_s * 2**attempt + random.random()
+                    )
+
+    async def _acompact_context(self):
+        request = self._summary_request()
+        if request is not None:
+            completion = await self._acreate(
+                messages=request,
+                model=self.summary_model,
+            )
+            self._apply_summary(_remove_thinking(completion.choices[0].message.content))
 
     def get_response(self, prompt):
-        self._messages.append(prompt)
+        self._compact_context()
+        self.add_context(prompt)
+
+        context = self._construct_context()
+        key = _cache_key(self.groq_model, context)
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
 
         chat_completion = self.client.chat.completions.create(
-            messages=self._construct_context(),
+            messages=context,
             model=self.groq_model,
         )
 
         # remove the thinking shit
-        return re.sub(
-            r"<think>[\s\S]*?</think>", "", chat_completion.choices[0].message.content
-        )
+        response = _remove_thinking(chat_completion.choices[0].message.content)
+        _cache_put(key, response)
+        return response
+
+    async def aget_response(self, prompt, on_token=None):
+        await self._acompact_context()
+        self.add_context(prompt)
+
+        context = self._construct_context()
+        key = _cache_key(self.groq_model, context)
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+
+        response = _remove_thinking(await self._acreate(
+            on_token,
+            messages=context,
+            model=self.groq_model,
+            stream=True,
+        ))
+        _cache_put(key, response)
+        return response
 
 
 class KimiK2(GroqModel):
     def __init__(self, instructions=""):
         super().__init__("moonshotai/kimi-k2-instruct-0905", instructions)
 
-        self.init()
-
 
 class GptOss(GroqModel):
     def __init__(self, instructions=""):
         super().__init__("openai/gpt-oss-120b", instructions)
 
-        self.init()
-
 
 class Qwen3(GroqModel):
     def __init__(self, instructions=""):
         super().__init__("qwen/qwen3-32b", instructions)
 
-        self.init()
-
 
 class Llama33(GroqModel):
     def __init__(self, instructions=""):
         super().__init__("llama-3.3-70b-versatile", instructions)
 
-        self.init()
-
 
 class Gemini3Flash(Llm):
     def __init__(self, instructions=""):
@@ -168,7 +403,7 @@ class Gemini3Flash(Llm):
         self._added_context.append(msg)
 
     def init(self):
-        self.client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+        self.client = _gemini()
 
         # creates a new chat object, prevents duplication of code even
         # if it's semantically weird
@@ -184,13 +419,15 @@ class Gemini3Flash(Llm):
 
 
 # DeepSeek subclass
+DEEPSEEK_URL = "https://api.deepseek.com/chat/completions"
+
+
 class DeepSeek(Llm):
     def __init__(self, instructions=""):
         super().__init__(instructions)
 
         self._instructions = instructions
         self._messages = []
-        self.client = None
 
         self.init()
 
@@ -243,14 +480,11 @@ class DeepSeek(Llm):
         # Fallback to requests
         return self._get_response_requests(prompt)
 
-    def _get_response_requests(self, prompt):
-        """Direct requests implementation"""
-        URL = "https://api.deepseek.com/chat/completions"
-        API_KEY = os.environ["DEEPSEEK_API_KEY"]
-
+    def _request_parts(self):
+        """Headers and body for calling the chat completions endpoint directly"""
         headers = {
             "Content-Type": "application/json",
-            "Authorization": f"Bearer {API_KEY}",
+            "Authorization": f"Bearer {os.environ['DEEPSEEK_API_KEY']}",
         }
 
         data = {
@@ -259,8 +493,14 @@ class DeepSeek(Llm):
             "stream": False,
         }
 
+        return headers, data
+
+    def _get_response_requests(self, prompt):
+        """Direct requests implementation"""
+        headers, data = self._request_parts()
+
         try:
-            response = requests.post(URL, headers=headers, json=data, timeout=30)
+            response = requests.post(DEEPSEEK_URL, headers=headers, json=data, timeout=30)
             response.raise_for_status()
             result = response.json()
 
@@ -273,6 +513,28 @@ class DeepSeek(Llm):
             return f"Error: {e}"
         except KeyError as e:
             return f"Unexpected API response format: {e}"
+
+    async def aget_response(self, prompt, on_token=None):
+        """Async version of the direct implementation, over a shared keep-alive client"""
+        self._messages.append({"role": "user", "content": prompt})
+
+        headers, data = self._request_parts()
+
+        try:
+            response = await _deepseek_http().post(DEEPSEEK_URL, headers=headers, json=data)
+            response.raise_for_status()
+            result = response.json()
+
+            ai_response = result["choices"][0]["message"]["content"]
+            self._messages.append({"role": "assistant", "content": ai_response})
+
+            return ai_response
+
+        except httpx.HTTPError as e:
+            return f"Error: {e}"
+        except KeyError as e:
+            return f"Unexpected API response format: {e}"
+
     def add_context(self, msg):
         return super().add_context(msg)
 
@@ -296,8 +558,6 @@ OPENROUTER_MODELS = {
     ],
 }
 
-import random
-
 
 class OpenRouter(Llm):
     def __init__(self, provider, instructions="", model=None):
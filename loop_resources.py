@@ -0,0 +1,34 @@
+import asyncio
+import inspect
+import weakref
+
+
+# Async clients, sessions and semaphores are bound to the event loop they were
+# made on. llms.py and src/debate_tools share them per loop through here, weakly
+# keyed so a finished loop's resources go with it, and whoever runs the loop
+# closes them with aclose_loop_resources() before it stops.
+_loop_resources = weakref.WeakKeyDictionary()
+
+
+def per_loop(name, factory):
+    """The running loop's resource called name, made with factory() on first use"""
+    resources = _loop_resources.setdefault(asyncio.get_running_loop(), {})
+    if name not in resources:
+        resources[name] = factory()
+    return resources[name]
+
+
+async def aclose_loop_resources():
+    """Close the running loop's clients and sessions, must be called on that loop"""
+    resources = _loop_resources.pop(asyncio.get_running_loop(), {})
+    for resource in resources.values():
+        # genai.Client keeps its async side on .aio
+        resource = getattr(resource, "aio", resource)
+        # httpx and genai have aclose(), openai, groq and aiohttp an async close()
+        close = getattr(resource, "aclose", None) or getattr(resource, "close", None)
+        if not inspect.iscoroutinefunction(close):
+            continue
+        try:
+            await close()
+        except Exception:
+            pass
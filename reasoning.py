@@ -1,5 +1,8 @@
+import asyncio
+import itertools
 import random
-import time
+
+from event_log import EventLog
 
 
 class GameState:
@@ -7,13 +10,18 @@ class GameState:
         self.cards = []
         self.puzzle = None
 
-        # [(Card, message)]
-        self.debate_history = []
+        # (event, turn id, Card, text), followed by /api/sync
+        # "token" is a piece of a turn that's still streaming in, "message" is the finished turn,
+        # "drop" means the turn failed and whatever was streamed for it should go
+        self.debate_history = EventLog()
+        self._turn_ids = itertools.count()
 
         self.debating = False
 
-    def start_debate(self):
+    async def start_debate(self):
         self.debating = True
+        # pages that connect from now on only get this debate
+        self.debate_history.clear()
 
         for card in self.cards:
            print(f"{card.role}, {card.model}, {card.personality}, {card.expertise}")
@@ -34,36 +42,55 @@ class GameState:
             for card in self.cards:
                 print("requesting " + card.model)
 
-                try:
-                    response = card.client.get_response("It is now your turn to speak.")
-                except Exception as e:
-                   print("something went wrong" + str(e))
+            # everyone is asked at once, so unlike the old one-by-one loop a card no longer
+            # hears the cards before it in the same round, only the rounds before
+            # (the facilitator still hears the whole round)
+            results = await asyncio.gather(
+                *(self._take_turn(card) for card in self.cards),
+                return_exceptions=True,
+            )
+
+            for card, result in zip(self.cards, results):
+                if isinstance(result, Exception):
+                    print("something went wrong" + str(result))
                 else:
-                    self._share_context(response, card)
+                    turn, response = result
+                    self._share_context(response, card, turn)
                     facilitator.client.add_context(response)
 
-                time.sleep(0.5)
-
                 print(card.model + " responded")
 
             try:
-                response = facilitator.client.get_response("It is now your turn to speak.")
+                turn, response = await self._take_turn(facilitator)
             except Exception as e:
                 print("something went wrong " + str(e))
             else:
-                self._share_context(response, facilitator)
+                self._share_context(response, facilitator, turn)
 
                 if "that is the answer" in response.lower():
                     print("done, breaking")
                     break
 
-            time.sleep(0.5)
+            await asyncio.sleep(0.5)
 
         self.debating = False
 
-    def _share_context(self, msg: str, card):
+    async def _take_turn(self, card):
+        turn = next(self._turn_ids)
+
+        try:
+            response = await card.client.aget_response(
+                "It is now your turn to speak.",
+                on_token=lambda delta: self.debate_history.append(("token", turn, card, delta)),
+            )
+        except Exception:
+            self.debate_history.append(("drop", turn, card, ""))
+            raise
+        return turn, response
+
+    def _share_context(self, msg: str, card, turn: int):
         for other_card in self.cards:
             if card is not other_card:
                 other_card.client.add_context(msg)
 
-        self.debate_history.append((card, msg))
\ No newline at end of file
+        self.debate_history.append(("message", turn, card, msg))
\ No newline at end of file
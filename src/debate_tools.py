@@ -6,15 +6,38 @@ to enable multi-model debate orchestration.
 
 import os
 import json
+import asyncio
+import hashlib
+import queue
+import random
+import re
+import threading
+import time
+import warnings
+import aiohttp
+import orjson
 import requests
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict, deque
+from functools import lru_cache, partial
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from pydantic import BaseModel, Field
+from google import genai
 from google.adk.tools import ToolContext
+from openai import AsyncOpenAI, RateLimitError
+from loop_resources import per_loop, aclose_loop_resources
 
 
 # Flask API URL for pushing messages to frontend
 FLASK_API_URL = os.environ.get("FLASK_API_URL", "http://127.0.0.1:5000")
 
+# One keep-alive session for every frontend push, instead of a new connection per message
+_FRONTEND_SESSION = requests.Session()
+_FRONTEND_SESSION.mount(
+    "http://",
+    requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=16, max_retries=0)
+)
+_FRONTEND_SESSION.headers["Content-Type"] = "application/json"
+
 # Color mapping for debate roles
 ROLE_COLOURS = {
     "facilitator": "#DC143C",  # Red
@@ -26,18 +49,33 @@ ROLE_COLOURS = {
 }
 
 
+# Pending frontend pushes, sent in order by a background thread so the debate
+# never waits on the Flask API
+_MSG_QUEUE: "queue.Queue[Dict[str, str]]" = queue.Queue(maxsize=1024)
+
+
+def _pusher():
+    """Drain _MSG_QUEUE, posting each message to the frontend."""
+    while True:
+        item = _MSG_QUEUE.get()
+        try:
+            # Serialised here, off the debate's thread, with orjson instead of requests' json=
+            _FRONTEND_SESSION.post(f"{FLASK_API_URL}/api/message", data=orjson.dumps(item), timeout=2)
+        except:
+            pass  # Don't let frontend issues break the debate
+
+
+threading.Thread(target=_pusher, name="frontend-pusher", daemon=True).start()
+
+
 def _push_to_frontend(role: str, message: str, model: str = ""):
-    """Push a message to the frontend via Flask API (fire-and-forget)."""
+    """Queue a message for the frontend (fire-and-forget)."""
+    colour = ROLE_COLOURS.get(role, "#FFFFFF")
+    display_msg = f"[{model}] {message}" if model else message
     try:
-        colour = ROLE_COLOURS.get(role, "#FFFFFF")
-        display_msg = f"[{model}] {message}" if model else message
-        requests.post(
-            f"{FLASK_API_URL}/api/message",
-            json={"role": role, "message": display_msg, "colour": colour},
-            timeout=2
-        )
-    except:
-        pass  # Don't let frontend issues break the debate
+        _MSG_QUEUE.put_nowait({"role": role, "message": display_msg, "colour": colour})
+    except queue.Full:
+        pass  # Drop the message rather than stall the debate
 
 
 # Role instructions for debate participants
@@ -49,34 +87,123 @@ ROLE_INSTRUCTIONS = {
 }
 
 
-def _build_system_prompt(role: str, personality: str, expertise: str) -> str:
-    """Build the system prompt for a debate participant."""
+@lru_cache(maxsize=64)
+def _build_system_prompt(role: str, personality: str, expertise: str) -> Tuple[str, str]:
+    """
+    Build the system prompt for a debate participant.
+    
+    Returned as (static_prefix, dynamic_suffix): the prefix only depends on the role, so it
+    stays byte-identical across calls and provider-side prompt caching can reuse it.
+    """
     role_instruction = ROLE_INSTRUCTIONS.get(role, "Participate in the discussion constructively.")
-    return f'''You are part of an elite reasoning team whose objective is to solve puzzles.
+    static_prefix = f'''You are part of an elite reasoning team whose objective is to solve puzzles.
 You will all take turns adding to the discussion. Work together to solve the problem. Once everyone has gone,
 the facilitator will decide if there should be another round of discussion.
-Your role is {role}. {role_instruction} Your personality is {personality}. Your expertise is {expertise}.
-During discussion, act as someone with your personality and expertise would act. Be super concise in your speech. Try your best to go under 600 chars.
+Be super concise in your speech. Try your best to go under 600 chars.
 Everytime you speak, let everyone know your role in the following format : 'I am the <role>', where role is one of the following: state tracker, facilitator, reasoner, or critic. And remember, don't break character.
 Follow the rules, work together, and support the facilitator until they can deliver the solution.
-Before you are told to speak, you will be given the conversation that is currently unfolding. Don't hallucinate please.'''
+Before you are told to speak, you will be given the conversation that is currently unfolding. Don't hallucinate please.
+Your role is {role}. {role_instruction}'''
+    dynamic_suffix = f'''Your personality is {personality}. Your expertise is {expertise}.
+During discussion, act as someone with your personality and expertise would act.'''
+    return static_prefix, dynamic_suffix
 
 
-def _call_openai(messages: List[Dict[str, str]], model: str = "gpt-4o") -> str:
-    """Call OpenAI API with the given messages."""
-    from openai import OpenAI
+# Provider clients are shared so their connection pools (and TLS sessions) are
+# reused across calls.
+
+def _openai_client(api_key: str) -> AsyncOpenAI:
+    """Shared OpenAI client for this key and the running event loop."""
+    return per_loop(("openai", api_key), lambda: AsyncOpenAI(api_key=api_key))
+
+
+def _gemini_client(api_key: str) -> genai.Client:
+    """Shared Gemini client for this key and the running event loop."""
+    return per_loop(("gemini", api_key), lambda: genai.Client(api_key=api_key))
+
+
+def _groq_client(api_key: str) -> AsyncOpenAI:
+    """Shared Groq client (OpenAI-compatible API) for this key and the running event loop."""
+    return per_loop(
+        ("groq", api_key),
+        lambda: AsyncOpenAI(api_key=api_key, base_url="https://api.groq.com/openai/v1")
+    )
+
+
+# Rate-limit headroom per OpenAI-compatible provider, from the x-ratelimit-*
+# headers of the last response: {"remaining": requests left, "reset_at": monotonic time}.
+# Calls only wait when the provider has said the window is used up.
+_PROVIDER_STATE: Dict[str, Dict[str, float]] = {}
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def _parse_duration(value: str) -> float:
+    """Seconds in a rate-limit reset header such as '1m30.5s' or '120ms'."""
+    try:
+        return float(value)
+    except ValueError:
+        return sum(float(n) * _DURATION_UNITS[unit] for n, unit in _DURATION_PART.findall(value))
+
+
+def _note_rate_limits(provider: str, headers) -> None:
+    remaining = headers.get("x-ratelimit-remaining-requests")
+    reset = headers.get("x-ratelimit-reset-requests")
+    if remaining is None or reset is None:
+        return
+    try:
+        _PROVIDER_STATE[provider] = {
+            "remaining": int(remaining),
+            "reset_at": time.monotonic() + _parse_duration(reset)
+        }
+    except ValueError:
+        pass
+
+
+async def _create_chat(client: AsyncOpenAI, provider: str, **kwargs):
+    """
+    chat.completions.create that waits out, and records, the provider's rate limits.
+    max_tokens=None leaves the length up to the model.
+    """
+    if kwargs.get("max_tokens") is None:
+        kwargs.pop("max_tokens", None)
+    state = _PROVIDER_STATE.get(provider)
+    if state and state["remaining"] <= 1:
+        delay = state["reset_at"] - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
     
+    try:
+        raw = await client.chat.completions.with_raw_response.create(**kwargs)
+    except RateLimitError as e:
+        # The SDK has already retried with backoff; hold later calls off until Retry-After
+        retry_after = e.response.headers.get("retry-after")
+        _PROVIDER_STATE[provider] = {
+            "remaining": 0,
+            "reset_at": time.monotonic() + (_parse_duration(retry_after) if retry_after else 1.0)
+        }
+        raise
+    _note_rate_limits(provider, raw.headers)
+    # with_raw_response gives a LegacyAPIResponse, whose parse() is synchronous even on the async client
+    return raw.parse()
+
+
+async def _acall_openai(messages: List[Dict[str, str]], model: str = "gpt-4o", max_tokens: Optional[int] = 800) -> str:
+    """Call OpenAI API with the given messages."""
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
         return "Error: OPENAI_API_KEY not set in environment"
     
-    client = OpenAI(api_key=api_key)
+    client = _openai_client(api_key)
     
     try:
-        response = client.chat.completions.create(
+        response = await _create_chat(
+            client,
+            "openai",
             model=model,
             messages=messages,
-            max_tokens=800,
+            max_tokens=max_tokens,
             temperature=0.7
         )
         return response.choices[0].message.content
@@ -84,34 +211,27 @@ def _call_openai(messages: List[Dict[str, str]], model: str = "gpt-4o") -> str:
         return f"OpenAI Error: {str(e)}"
 
 
-def _call_gemini(messages: List[Dict[str, str]], model: str = "gemini-2.5-flash") -> str:
-    """Call Gemini API with the given messages."""
-    from google import genai
-    
+def _gemini_config(system_instruction: str) -> genai.types.GenerateContentConfig:
+    """Generation config for a Gemini call, with the system prompt passed natively."""
+    return genai.types.GenerateContentConfig(
+        system_instruction=system_instruction,
+        temperature=0.7
+    )
+
+
+async def _acall_gemini(system_instruction: str, user_content: str, model: str = "gemini-2.5-flash") -> str:
+    """Call Gemini API with a system instruction and the user turn."""
     api_key = os.environ.get("GEMINI_API_KEY")
     if not api_key:
         return "Error: GEMINI_API_KEY not set in environment"
     
     try:
-        client = genai.Client(api_key=api_key)
+        client = _gemini_client(api_key)
         
-        # Convert OpenAI-style messages to Gemini format
-        # Extract system message and user messages
-        system_content = ""
-        conversation_parts = []
-        
-        for msg in messages:
-            if msg["role"] == "system":
-                system_content = msg["content"]
-            else:
-                conversation_parts.append(msg["content"])
-        
-        # Combine system prompt with conversation
-        full_prompt = system_content + "\n\n" + "\n".join(conversation_parts)
-        
-        response = client.models.generate_content(
+        response = await client.aio.models.generate_content(
             model=model,
-            contents=full_prompt
+            contents=user_content,
+            config=_gemini_config(system_instruction)
         )
         return response.text
     except Exception as e:
@@ -126,25 +246,22 @@ GROQ_MODELS = {
 }
 
 
-def _call_groq(messages: List[Dict[str, str]], model: str = "llama-3.3-70b-versatile") -> str:
+async def _acall_groq(messages: List[Dict[str, str]], model: str = "llama-3.3-70b-versatile", max_tokens: Optional[int] = 800) -> str:
     """Call Groq API with the given messages."""
-    from openai import OpenAI
-    
     api_key = os.environ.get("GROQ_API_KEY")
     if not api_key:
         return "Error: GROQ_API_KEY not set in environment"
     
     # Groq uses OpenAI-compatible API
-    client = OpenAI(
-        api_key=api_key,
-        base_url="https://api.groq.com/openai/v1"
-    )
+    client = _groq_client(api_key)
     
     try:
-        response = client.chat.completions.create(
+        response = await _create_chat(
+            client,
+            "groq",
             model=model,
             messages=messages,
-            max_tokens=800,
+            max_tokens=max_tokens,
             temperature=0.7
         )
         return response.choices[0].message.content
@@ -152,7 +269,244 @@ def _call_groq(messages: List[Dict[str, str]], model: str = "llama-3.3-70b-versa
         return f"Groq Error: {str(e)}"
 
 
-def call_llm(
+# Streaming variants, used when the caller only needs the response up to a stop
+# phrase (the facilitator's verdict). The request is closed as soon as it appears.
+
+async def _read_until(chunks: AsyncIterator[str], stop_phrase: str) -> str:
+    """
+    Join streamed text, returning as soon as stop_phrase has been seen (case-insensitive).
+    Text inside <think> blocks is ignored: reasoning models quote their instructions there.
+    """
+    parts = []
+    pending = ""
+    in_think = False
+    keep = max(len(stop_phrase), len("<think>"), len("</think>")) - 1
+    async for text in chunks:
+        parts.append(text)
+        pending += text.lower()
+        while True:
+            if in_think:
+                end = pending.find("</think>")
+                if end < 0:
+                    break
+                pending = pending[end + len("</think>"):]
+                in_think = False
+            else:
+                start = pending.find("<think>")
+                stop = pending.find(stop_phrase)
+                if stop >= 0 and (start < 0 or stop < start):
+                    return "".join(parts)
+                if start < 0:
+                    break
+                pending = pending[start + len("<think>"):]
+                in_think = True
+        pending = pending[-keep:] if keep else ""
+    return "".join(parts)
+
+
+async def _astream_chat(client: AsyncOpenAI, provider: str, messages: List[Dict[str, str]], model: str, stop_phrase: str, max_tokens: Optional[int]) -> str:
+    """Stream an OpenAI-compatible chat completion until stop_phrase."""
+    stream = await _create_chat(
+        client,
+        provider,
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=0.7,
+        stream=True
+    )
+    try:
+        return await _read_until(
+            (chunk.choices[0].delta.content or "" async for chunk in stream if chunk.choices),
+            stop_phrase
+        )
+    finally:
+        await stream.close()
+
+
+async def _astream_openai(messages: List[Dict[str, str]], model: str, stop_phrase: str, max_tokens: Optional[int] = 800) -> str:
+    """Streaming _acall_openai that stops at stop_phrase."""
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        return "Error: OPENAI_API_KEY not set in environment"
+    
+    try:
+        return await _astream_chat(_openai_client(api_key), "openai", messages, model, stop_phrase, max_tokens)
+    except Exception as e:
+        return f"OpenAI Error: {str(e)}"
+
+
+async def _astream_groq(messages: List[Dict[str, str]], model: str, stop_phrase: str, max_tokens: Optional[int] = 800) -> str:
+    """Streaming _acall_groq that stops at stop_phrase."""
+    api_key = os.environ.get("GROQ_API_KEY")
+    if not api_key:
+        return "Error: GROQ_API_KEY not set in environment"
+    
+    try:
+        return await _astream_chat(_groq_client(api_key), "groq", messages, model, stop_phrase, max_tokens)
+    except Exception as e:
+        return f"Groq Error: {str(e)}"
+
+
+async def _astream_gemini(system_instruction: str, user_content: str, model: str, stop_phrase: str) -> str:
+    """Streaming _acall_gemini that stops at stop_phrase."""
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        return "Error: GEMINI_API_KEY not set in environment"
+    
+    try:
+        client = _gemini_client(api_key)
+        stream = await client.aio.models.generate_content_stream(
+            model=model,
+            contents=user_content,
+            config=_gemini_config(system_instruction)
+        )
+        try:
+            return await _read_until((chunk.text or "" async for chunk in stream), stop_phrase)
+        finally:
+            await stream.aclose()
+    except Exception as e:
+        return f"Gemini Error: {str(e)}"
+
+
+class _RateLimiter:
+    """
+    Caps concurrent LLM calls and keeps them under a requests-per-minute budget
+    (sliding window), replacing fixed sleeps between turns.
+    """
+
+    def __init__(self, max_concurrency: int, rpm: int):
+        self.max_concurrency = max_concurrency
+        self.rpm = rpm
+        self._stamps: "deque[float]" = deque()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # A semaphore belongs to one event loop, and each streaming debate runs its own
+        return per_loop(("rate_limiter", id(self)), lambda: asyncio.Semaphore(self.max_concurrency))
+
+    async def __aenter__(self):
+        sem = self._semaphore()
+        await sem.acquire()
+        try:
+            await self._wait_for_slot()
+        except BaseException:
+            sem.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self._semaphore().release()
+
+    async def _wait_for_slot(self):
+        while True:
+            now = time.monotonic()
+            while self._stamps and self._stamps[0] <= now - 60:
+                self._stamps.popleft()
+            if len(self._stamps) < self.rpm:
+                self._stamps.append(now)
+                return
+            await asyncio.sleep(self._stamps[0] + 60 - now)
+
+
+def _env_seed() -> Optional[int]:
+    """DEBATE_SEED as an int, or None (a fresh seed per debate) if it's unset or invalid."""
+    value = os.environ.get("DEBATE_SEED")
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        warnings.warn(f"DEBATE_SEED={value!r} is not an integer, using a fresh seed per debate")
+        return None
+
+
+# Seeds the speaking order, so a debate can be replayed by setting it to a past debate's seed
+_DEBATE_SEED = _env_seed()
+
+
+_LIMITER = _RateLimiter(
+    max_concurrency=int(os.environ.get("DEBATE_MAX_CONCURRENCY", "8")),
+    rpm=int(os.environ.get("DEBATE_RPM", "100"))
+)
+
+
+# Output token cap per role. Participants are asked for under 600 chars, and the
+# facilitator must get as far as its closing phrase, so the caps leave headroom.
+# Not applied to reasoning models, whose <think> output counts against the cap and
+# can use all of it before the answer starts (Gemini thinks, and so does Qwen 3).
+_ROLE_MAX_TOKENS = {
+    "facilitator": 600,
+    "critic": 400,
+    "reasoner": 400,
+    "stateTracker": 300,
+}
+_UNCAPPED_MODELS = {GROQ_MODELS["qwen"]}
+
+
+# Exact-match response cache, opt-in with DEBATE_CACHE=1 since sampling is not
+# deterministic at temperature 0.7. Keyed on (provider, model, request).
+_LLM_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_LLM_CACHE_SIZE = 512
+
+
+def _llm_cache_key(provider: str, model: str, request: tuple) -> str:
+    """Stable hash of an LLM request."""
+    raw = json.dumps([provider, model, request], sort_keys=True).encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+_THINK_BLOCK = re.compile(r"<think>.*?(?:</think>|$)", re.DOTALL)
+
+
+def _spoken(response: Optional[str]) -> str:
+    """The response without its <think> blocks, including one left unclosed."""
+    return _THINK_BLOCK.sub("", response or "").strip()
+
+
+def _is_error_response(response: Optional[str]) -> bool:
+    """
+    Provider helpers return errors as text; those must not be cached. Neither must a
+    reply that is all reasoning, e.g. one cut off by max_tokens before it got to the answer.
+    """
+    spoken = _spoken(response)
+    return not spoken or spoken.startswith(("Error:", "OpenAI Error:", "Gemini Error:", "Groq Error:"))
+
+
+# Frontend model names -> canonical provider
+_PROVIDER_ALIAS = {
+    "chatgpt": "openai",
+    "gpt": "openai",
+    "openai": "openai",
+    "google": "gemini",
+    "gemini": "gemini",
+    "llama": "llama",
+    "qwen": "qwen",
+    "kimi": "kimi",
+}
+
+# Canonical provider -> (call, streaming call, default model)
+_PROVIDER_DISPATCH = {
+    "openai": (_acall_openai, _astream_openai, "gpt-4o"),
+    "gemini": (_acall_gemini, _astream_gemini, "gemini-2.5-flash"),
+    "llama": (_acall_groq, _astream_groq, GROQ_MODELS["llama"]),
+    "qwen": (_acall_groq, _astream_groq, GROQ_MODELS["qwen"]),
+    "kimi": (_acall_groq, _astream_groq, GROQ_MODELS["kimi"]),
+}
+
+# Facilitator's closing phrase; ends the debate. It's told to end with it, and
+# streaming stops right after it, so the runners only look at the tail.
+ANSWER_SENTINEL = "that is the answer"
+
+
+def _has_verdict(response: str) -> bool:
+    """Whether the facilitator closed with ANSWER_SENTINEL, outside any <think> block."""
+    spoken = response.rsplit("</think>", 1)[-1]
+    if "<think>" in spoken:
+        return False  # cut off mid-reasoning
+    return ANSWER_SENTINEL in spoken[-80:].lower()
+
+
+async def call_llm(
     provider: str,
     role: str,
     personality: str,
@@ -180,46 +534,95 @@ def call_llm(
     Returns:
         Dict with status, response text, and metadata
     """
+    return await _call_llm(
+        provider, role, personality, expertise, puzzle, conversation_history, prompt, model_name
+    )
+
+
+async def _call_llm(
+    provider: str,
+    role: str,
+    personality: str,
+    expertise: str,
+    puzzle: str,
+    conversation_history: str,
+    prompt: str,
+    model_name: Optional[str] = None,
+    stop_phrase: Optional[str] = None,
+    system_prompt: Optional[Tuple[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    call_llm, plus the runners' internal options (kept out of the agent tool's schema).
+    
+    stop_phrase: if given, stream the response and stop as soon as this phrase appears
+    system_prompt: optional pre-built _build_system_prompt result for this participant
+    """
     provider = provider.lower().strip()
+    provider = _PROVIDER_ALIAS.get(provider, provider)
     
-    # Build system prompt
-    system_prompt = _build_system_prompt(role, personality, expertise)
-    
-    # Build messages
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": f"The puzzle is: {puzzle}"},
-    ]
-    
-    # Add conversation history if present
-    if conversation_history and conversation_history.strip():
-        messages.append({"role": "user", "content": f"Conversation so far:\n{conversation_history}"})
-    
-    # Add current prompt
-    messages.append({"role": "user", "content": prompt})
-    
-    # Call appropriate provider
-    if provider == "openai" or provider == "chatgpt":
-        model = model_name or "gpt-4o"
-        response = _call_openai(messages, model)
-    elif provider == "gemini":
-        model = model_name or "gemini-2.5-flash"
-        response = _call_gemini(messages, model)
-    elif provider == "llama":
-        model = model_name or GROQ_MODELS["llama"]
-        response = _call_groq(messages, model)
-    elif provider == "qwen":
-        model = model_name or GROQ_MODELS["qwen"]
-        response = _call_groq(messages, model)
-    elif provider == "kimi":
-        model = model_name or GROQ_MODELS["kimi"]
-        response = _call_groq(messages, model)
-    else:
+    if provider not in _PROVIDER_DISPATCH:
         return {
             "status": "error",
             "message": f"Unknown provider: {provider}. Use 'openai', 'gemini', 'llama', 'qwen', or 'kimi'.",
             "response": None
         }
+    acall, astream, default_model = _PROVIDER_DISPATCH[provider]
+    model = model_name or default_model
+    if stop_phrase:
+        acall = partial(astream, stop_phrase=stop_phrase)
+    if provider != "gemini":
+        max_tokens = None if model in _UNCAPPED_MODELS else _ROLE_MAX_TOKENS.get(role, 800)
+        acall = partial(acall, max_tokens=max_tokens)
+    
+    # Build system prompt
+    static_prefix, dynamic_suffix = system_prompt or _build_system_prompt(role, personality, expertise)
+    has_history = conversation_history and conversation_history.strip()
+    
+    if provider == "gemini":
+        # Gemini takes the system prompt as system_instruction and a single user turn
+        user_content = f"The puzzle is: {puzzle}\n\n"
+        if has_history:
+            user_content += f"Conversation so far:\n{conversation_history}\n\n"
+        request = (f"{static_prefix}\n{dynamic_suffix}", user_content + prompt)
+    else:
+        # Build messages, most stable first so the cacheable prefix is as long as possible
+        messages = [
+            {"role": "system", "content": static_prefix},
+            {"role": "system", "content": dynamic_suffix},
+            {"role": "user", "content": f"The puzzle is: {puzzle}"},
+        ]
+        
+        # Add conversation history if present
+        if has_history:
+            messages.append({"role": "user", "content": f"Conversation so far:\n{conversation_history}"})
+        
+        # Add current prompt
+        messages.append({"role": "user", "content": prompt})
+        request = (messages,)
+    
+    use_cache = os.environ.get("DEBATE_CACHE") == "1"
+    cached = False
+    if use_cache:
+        key = _llm_cache_key(provider, model, request)
+        response = _LLM_CACHE.get(key)
+        if response is not None:
+            _LLM_CACHE.move_to_end(key)
+            cached = True
+    
+    if not cached:
+        async with _LIMITER:
+            response = await acall(*request, model)
+        if _is_error_response(response):
+            # Provider helpers report failures as text; don't let them pass as a turn
+            return {
+                "status": "error",
+                "message": _spoken(response) or f"Empty response from {provider}",
+                "response": None
+            }
+        if use_cache:
+            _LLM_CACHE[key] = response
+            if len(_LLM_CACHE) > _LLM_CACHE_SIZE:
+                _LLM_CACHE.popitem(last=False)
     
     return {
         "status": "success",
@@ -227,11 +630,12 @@ def call_llm(
         "role": role,
         "personality": personality,
         "expertise": expertise,
-        "response": response
+        "response": response,
+        "cached": cached
     }
 
 
-def run_debate(
+async def run_debate(
     puzzle: str,
     cards: str,
     max_rounds: int = 4,
@@ -253,9 +657,6 @@ def run_debate(
     Returns:
         Dict with debate history, final answer, and status
     """
-    import random
-    import time
-    
     # Parse cards configuration
     try:
         if isinstance(cards, str):
@@ -296,45 +697,68 @@ def run_debate(
             "debate_history": [],
             "final_answer": None
         }
+    participants = tuple(participants)
+    
+    # System prompts only depend on the card, so build them once per debate
+    system_prompts = {
+        id(card): _build_system_prompt(
+            card.get("role", "reasoner"),
+            card.get("personality", "analytical"),
+            card.get("expertise", "general")
+        )
+        for card in participants
+    }
+    fac_system_prompt = _build_system_prompt(
+        "facilitator",
+        facilitator.get("personality", "decisive"),
+        facilitator.get("expertise", "leadership")
+    )
     
     # Push start message to frontend
     _push_to_frontend("system", f"🎯 Starting debate on: {puzzle}")
     
     # Run debate
     debate_history = []
-    conversation_text = ""
+    conversation_parts: List[str] = []
+    # Speakers only see the last full round (everyone plus the facilitator)
+    window = max(4, len(participants) + 1)
     final_answer = None
+    # Seeded speaking order, so a debate can be replayed with DEBATE_SEED
+    seed = _DEBATE_SEED if _DEBATE_SEED is not None else time.time_ns()
+    rng = random.Random(seed)
+    
+    rounds_completed = 0
     
     for round_num in range(max_rounds):
+        rounds_completed += 1
         _push_to_frontend("system", f"📢 Round {round_num + 1} of {max_rounds}")
         
         # Shuffle participants each round
-        random.shuffle(participants)
+        ordered = rng.sample(participants, len(participants))
         
-        # Each participant speaks
-        for card in participants:
-            provider = card.get("model", "openai")
-            # Map frontend model names to providers
-            if provider.lower() in ["chatgpt", "gpt", "openai"]:
-                provider = "openai"
-            elif provider.lower() in ["gemini", "google"]:
-                provider = "gemini"
-            elif provider.lower() == "llama":
-                provider = "llama"
-            elif provider.lower() == "qwen":
-                provider = "qwen"
-            elif provider.lower() == "kimi":
-                provider = "kimi"
-            
-            result = call_llm(
-                provider=provider,
+        # Each participant speaks. All participants are asked concurrently, so each
+        # one only sees earlier rounds, not the turns before it in this round (unlike
+        # the old sequential loop); the facilitator still sees the whole round.
+        # _call_llm maps frontend model names to providers
+        conversation_text = "".join(conversation_parts[-window:])
+        results = await asyncio.gather(*[
+            _call_llm(
+                provider=card.get("model", "openai"),
                 role=card.get("role", "reasoner"),
                 personality=card.get("personality", "analytical"),
                 expertise=card.get("expertise", "general"),
                 puzzle=puzzle,
                 conversation_history=conversation_text,
-                prompt="It is now your turn to speak."
+                prompt="It is now your turn to speak.",
+                system_prompt=system_prompts[id(card)]
             )
+            for card in ordered
+        ], return_exceptions=True)
+        
+        # Record turns in the shuffled order
+        for card, result in zip(ordered, results):
+            if isinstance(result, Exception):
+                result = {"status": "error", "message": str(result)}
             
             if result["status"] == "success":
                 response = result["response"]
@@ -354,7 +778,7 @@ def run_debate(
                 })
                 
                 # Update conversation text for context sharing
-                conversation_text += f"\n[{role.upper()}]: {response}\n"
+                conversation_parts.append(f"\n[{role.upper()}]: {response}\n")
             else:
                 error_msg = result.get("message", "Unknown error")
                 _push_to_frontend("error", f"[{card.get('model', 'unknown')}] Error: {error_msg}")
@@ -363,31 +787,18 @@ def run_debate(
                     "model": card.get("model", "unknown"),
                     "error": error_msg
                 })
-            
-            # Small delay to avoid rate limiting
-            time.sleep(0.3)
         
         # Facilitator speaks
-        fac_provider = facilitator.get("model", "openai")
-        if fac_provider.lower() in ["chatgpt", "gpt", "openai"]:
-            fac_provider = "openai"
-        elif fac_provider.lower() in ["gemini", "google"]:
-            fac_provider = "gemini"
-        elif fac_provider.lower() == "llama":
-            fac_provider = "llama"
-        elif fac_provider.lower() == "qwen":
-            fac_provider = "qwen"
-        elif fac_provider.lower() == "kimi":
-            fac_provider = "kimi"
-        
-        fac_result = call_llm(
-            provider=fac_provider,
+        fac_result = await _call_llm(
+            provider=facilitator.get("model", "openai"),
             role="facilitator",
             personality=facilitator.get("personality", "decisive"),
             expertise=facilitator.get("expertise", "leadership"),
             puzzle=puzzle,
-            conversation_history=conversation_text,
-            prompt="It is now your turn to speak."
+            conversation_history="".join(conversation_parts[-window:]),
+            prompt="It is now your turn to speak.",
+            stop_phrase=ANSWER_SENTINEL,
+            system_prompt=fac_system_prompt
         )
         
         if fac_result["status"] == "success":
@@ -405,10 +816,10 @@ def run_debate(
                 "message": fac_response
             })
             
-            conversation_text += f"\n[FACILITATOR]: {fac_response}\n"
+            conversation_parts.append(f"\n[FACILITATOR]: {fac_response}\n")
             
             # Check if facilitator has reached a conclusion
-            if "that is the answer" in fac_response.lower():
+            if _has_verdict(fac_response):
                 final_answer = fac_response
                 _push_to_frontend("system", "✅ Debate concluded! Final answer reached.")
                 break
@@ -420,18 +831,17 @@ def run_debate(
                 "model": facilitator.get("model", "unknown"),
                 "error": error_msg
             })
-        
-        time.sleep(0.3)
     
     if not final_answer:
         _push_to_frontend("system", f"⏱️ Debate ended after {max_rounds} rounds without conclusion.")
     
     return {
         "status": "completed",
-        "rounds_completed": round_num + 1,
+        "seed": seed,
+        "rounds_completed": rounds_completed,
         "debate_history": debate_history,
         "final_answer": final_answer,
-        "conversation_transcript": conversation_text
+        "conversation_transcript": "".join(conversation_parts)
     }
 
 
@@ -443,6 +853,7 @@ def run_debate_streaming(
 ) -> Dict[str, Any]:
     """
     Run a debate with real-time message streaming via callback.
+    Blocking wrapper around arun_debate_streaming for callers without an event loop.
     
     Args:
         puzzle: The puzzle/problem to solve
@@ -453,9 +864,23 @@ def run_debate_streaming(
     Returns:
         Dict with status and final answer
     """
-    import random
-    import time
+    async def _run():
+        try:
+            return await arun_debate_streaming(puzzle, cards, max_rounds, on_message)
+        finally:
+            # This loop ends with the debate; don't leave its connection pools open
+            await aclose_loop_resources()
     
+    return asyncio.run(_run())
+
+
+async def arun_debate_streaming(
+    puzzle: str,
+    cards: list,
+    max_rounds: int = 4,
+    on_message: callable = None,
+) -> Dict[str, Any]:
+    """Async implementation of run_debate_streaming, see there for arguments."""
     cards_list = cards if isinstance(cards, list) else json.loads(cards)
     
     # Validate cards
@@ -474,26 +899,53 @@ def run_debate_streaming(
     
     if not facilitator:
         return {"status": "error", "message": "No facilitator found"}
+    participants = tuple(participants)
     
-    conversation_text = ""
+    # System prompts only depend on the card, so build them once per debate
+    system_prompts = {
+        id(card): _build_system_prompt(
+            card.get("role", "reasoner"),
+            card.get("personality", "analytical"),
+            card.get("expertise", "general")
+        )
+        for card in participants
+    }
+    fac_system_prompt = _build_system_prompt(
+        "facilitator",
+        facilitator.get("personality", "decisive"),
+        facilitator.get("expertise", "leadership")
+    )
+    
+    conversation_parts: List[str] = []
+    # Speakers only see the last full round (everyone plus the facilitator)
+    window = max(4, len(participants) + 1)
     final_answer = None
+    # Seeded speaking order, so a debate can be replayed with DEBATE_SEED
+    seed = _DEBATE_SEED if _DEBATE_SEED is not None else time.time_ns()
+    rng = random.Random(seed)
     
     for round_num in range(max_rounds):
-        random.shuffle(participants)
+        ordered = rng.sample(participants, len(participants))
         
-        # Each participant speaks
-        for card in participants:
-            provider = card.get("model", "openai")
-            
-            result = call_llm(
-                provider=provider,
+        # Each participant speaks, all at once, without seeing this round's earlier turns (see run_debate)
+        conversation_text = "".join(conversation_parts[-window:])
+        results = await asyncio.gather(*[
+            _call_llm(
+                provider=card.get("model", "openai"),
                 role=card.get("role", "reasoner"),
                 personality=card.get("personality", "analytical"),
                 expertise=card.get("expertise", "general"),
                 puzzle=puzzle,
                 conversation_history=conversation_text,
-                prompt="It is now your turn to speak."
+                prompt="It is now your turn to speak.",
+                system_prompt=system_prompts[id(card)]
             )
+            for card in ordered
+        ], return_exceptions=True)
+        
+        for card, result in zip(ordered, results):
+            if isinstance(result, Exception):
+                result = {"status": "error", "message": str(result)}
             
             if result["status"] == "success":
                 response = result["response"]
@@ -504,22 +956,22 @@ def run_debate_streaming(
                 if on_message:
                     on_message(role, response, model)
                 
-                conversation_text += f"\n[{role.upper()}]: {response}\n"
+                conversation_parts.append(f"\n[{role.upper()}]: {response}\n")
             else:
                 if on_message:
                     on_message("error", result.get("message", "LLM Error"), card.get("model", "unknown"))
-            
-            time.sleep(0.3)
         
         # Facilitator speaks
-        fac_result = call_llm(
+        fac_result = await _call_llm(
             provider=facilitator.get("model", "openai"),
             role="facilitator",
             personality=facilitator.get("personality", "decisive"),
             expertise=facilitator.get("expertise", "leadership"),
             puzzle=puzzle,
-            conversation_history=conversation_text,
-            prompt="It is now your turn to speak."
+            conversation_history="".join(conversation_parts[-window:]),
+            prompt="It is now your turn to speak.",
+            stop_phrase=ANSWER_SENTINEL,
+            system_prompt=fac_system_prompt
         )
         
         if fac_result["status"] == "success":
@@ -529,19 +981,18 @@ def run_debate_streaming(
             if on_message:
                 on_message("facilitator", fac_response, facilitator.get("model", "unknown"))
             
-            conversation_text += f"\n[FACILITATOR]: {fac_response}\n"
+            conversation_parts.append(f"\n[FACILITATOR]: {fac_response}\n")
             
-            if "that is the answer" in fac_response.lower():
+            if _has_verdict(fac_response):
                 final_answer = fac_response
                 break
         else:
             if on_message:
                 on_message("error", fac_result.get("message", "Facilitator Error"), facilitator.get("model", "unknown"))
-        
-        time.sleep(0.3)
     
     return {
         "status": "completed",
+        "seed": seed,
         "final_answer": final_answer
     }
 
@@ -550,7 +1001,20 @@ def run_debate_streaming(
 # FRONTEND MESSAGING TOOL
 # =============================================================================
 
-FLASK_API_URL = os.environ.get("FLASK_API_URL", "http://127.0.0.1:5000")
+def _get_aio_session() -> aiohttp.ClientSession:
+    """
+    Shared aiohttp session for send_frontend_message on the running event loop,
+    closed with the loop's other clients by aclose_loop_resources.
+    """
+    return per_loop(
+        "frontend_http",
+        lambda: aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=5),
+            connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=60),
+            headers={"Content-Type": "application/json"}
+        )
+    )
+
 
 async def send_frontend_message(
     role: str,
@@ -571,20 +1035,19 @@ async def send_frontend_message(
     Returns:
         A dictionary with the status of the message send operation.
     """
-    import requests
-    
     try:
-        response = requests.post(
+        session = _get_aio_session()
+        async with session.post(
             f"{FLASK_API_URL}/api/message",
-            json={
+            data=orjson.dumps({
                 "role": role,
                 "message": message,
                 "colour": colour
-            },
-            timeout=5
-        )
+            })
+        ) as response:
+            status = response.status
         
-        if response.status_code == 200:
+        if status == 200:
             return {
                 "status": "success",
                 "message": f"Message sent to frontend: [{role}] {message[:50]}..."
@@ -592,9 +1055,9 @@ async def send_frontend_message(
         else:
             return {
                 "status": "error",
-                "message": f"Failed to send message: HTTP {response.status_code}"
+                "message": f"Failed to send message: HTTP {status}"
             }
-    except requests.exceptions.ConnectionError:
+    except aiohttp.ClientConnectionError:
         return {
             "status": "error", 
             "message": "Could not connect to Flask API. Is it running?"
@@ -604,4 +1067,3 @@ async def send_frontend_message(
             "status": "error",
             "message": f"Error sending message: {str(e)}"
         }
-
@@ -0,0 +1,7 @@
+# gunicorn entry point, see gunicorn.conf.py
+# patching has to happen before anything imports socket/ssl/threading, so it comes first
+from gevent import monkey
+
+monkey.patch_all()
+
+from app_sam import app  # noqa: E402